@@ -99,7 +99,10 @@ def bitserial_conv2d_nhwc(
     ci, kh, kw = cfg.reduce_axis(CI_packed), cfg.reduce_axis(KH), cfg.reduce_axis(KW)
     ib, kb = cfg.reduce_axis(activation_bits), cfg.reduce_axis(weight_bits)
 
-    co, vc = cfg.define_split("tile_co", co, num_outputs=2, filter=lambda x: x.size[-1] == 8)
+    # The outer two factors block the output channels for the parallel loop
+    co_o, co_i, vc = cfg.define_split(
+        "tile_co", co, num_outputs=3, filter=lambda x: x.size[-1] in (8, 16)
+    )
     oh, vh = cfg.define_split("tile_oh", oh, num_outputs=2, filter=lambda x: x.size[-1] >= 2)
     ow, vw = cfg.define_split("tile_ow", ow, num_outputs=2, filter=lambda x: x.size[-1] >= 2)
     ci_o, ci_i = cfg.define_split(
@@ -107,11 +110,11 @@ def bitserial_conv2d_nhwc(
     )
     re_axes = cfg.define_reorder(
         "reorder_0",
-        [n, oh, ow, co, vh, vw, kh, kw, ci_o, kb, ib, vc, ci_i],
+        [n, oh, ow, co_o, vh, vw, kh, kw, ci_o, kb, ib, vc, ci_i],
         policy="candidate",
         candidate=[
-            [n, oh, ow, co, vh, vw, kh, kw, ci_o, kb, ib, vc, ci_i],
-            [n, oh, ow, co, vh, vw, kw, kh, ci_o, kb, ib, vc, ci_i],
+            [n, oh, ow, co_o, vh, vw, kh, kw, ci_o, kb, ib, vc, ci_i],
+            [n, oh, ow, co_o, vh, vw, kw, kh, ci_o, kb, ib, vc, ci_i],
         ],
     )
     # binary ops
@@ -165,27 +168,32 @@ def bitserial_conv2d_nhwc(
         return te.sum(
             (
                 tvm.tir.popcount(
-                    kernel_vec[co, dh, dw, kb, vc, ci].astype("uint16")
-                    & data_vec[n, h, w, vh * HSTR + dh, vw * WSTR + dw, ib, ci].astype("uint16")
-                )
+                    kernel_vec[co, dh, dw, kb, vc, ci]
+                    & data_vec[n, h, w, vh * HSTR + dh, vw * WSTR + dw, ib, ci]
+                ).astype("uint16")
                 << (kb + ib).astype("uint16")
             ),
             axis=[dh, dw, kb, ib, ci],
         )
 
     def _unipolar_conv(n, h, w, co, vh, vw, vc):
+        # popcount(~k & d) == popcount(d) - popcount(k & d), which avoids
+        # complementing the kernel inside the reduction. The per word difference
+        # is within [-8, 8] so it is formed in int8 and only widened to accumulate.
         return te.sum(
             (
                 (
-                    tvm.tir.popcount(
-                        kernel_vec[co, dh, dw, kb, vc, ci].astype("int16")
-                        & data_vec[n, h, w, vh * HSTR + dh, vw * WSTR + dw, ib, ci].astype("int16")
+                    (
+                        tvm.tir.popcount(
+                            kernel_vec[co, dh, dw, kb, vc, ci]
+                            & data_vec[n, h, w, vh * HSTR + dh, vw * WSTR + dw, ib, ci]
+                        ).astype("int8")
+                        << tvm.tir.const(1, "int8")
                     )
                     - tvm.tir.popcount(
-                        ~kernel_vec[co, dh, dw, kb, vc, ci].astype("int16")
-                        & data_vec[n, h, w, vh * HSTR + dh, vw * WSTR + dw, ib, ci]
-                    ).astype("int16")
-                )
+                        data_vec[n, h, w, vh * HSTR + dh, vw * WSTR + dw, ib, ci]
+                    ).astype("int8")
+                ).astype("int16")
                 << (kb + ib).astype("int16")
             ),
             axis=[dh, dw, kb, ib, ci],
@@ -228,9 +236,12 @@ def _intrin_popcount(m, k_i, w_b, x_b, unipolar):
             (m,),
             lambda i: te.sum(
                 (
-                    tvm.tir.popcount(w[bw, i, k].astype(dtype) & x[bx, k].astype(dtype))
-                    - tvm.tir.popcount(~w[bw, i, k].astype(dtype) & x[bx, k].astype(dtype))
-                )
+                    (
+                        tvm.tir.popcount(w[bw, i, k] & x[bx, k]).astype("int8")
+                        << tvm.tir.const(1, "int8")
+                    )
+                    - tvm.tir.popcount(x[bx, k]).astype("int8")
+                ).astype(dtype)
                 << (bw + bx).astype(dtype),
                 axis=[bw, bx, k],
             ),
@@ -241,7 +252,7 @@ def _intrin_popcount(m, k_i, w_b, x_b, unipolar):
         z = te.compute(
             (m,),
             lambda i: te.sum(
-                tvm.tir.popcount(w[bw, i, k].astype(dtype) & x[bx, k].astype(dtype))
+                tvm.tir.popcount(w[bw, i, k] & x[bx, k]).astype(dtype)
                 << (bw + bx).astype(dtype),
                 axis=[bw, bx, k],
             ),
@@ -259,71 +270,86 @@ def _intrin_popcount(m, k_i, w_b, x_b, unipolar):
         ww, xx = ins
         zz = outs[0]
 
+        args_1 = tvm.tir.const(1, "uint32")
         args_2 = tvm.tir.const(2, "uint32")
 
+        target = tvm.target.Target.current(allow_none=True)
+        is_aarch64 = target is not None and target.features.is_aarch64
+
         if unipolar:
             vpadd = "llvm.arm.neon.vpadd.v8i8"
             vpadalu = "llvm.arm.neon.vpadals.v16i8.v8i16"
+            vpaddl = "llvm.aarch64.neon.saddlp"
             full_dtype = "int8x16"
             half_dtype = "int8x8"
             return_dtype = "int16x8"
         else:
             vpadd = "llvm.arm.neon.vpadd.v8u8"
             vpadalu = "llvm.arm.neon.vpadalu.v16u8.v8u16"
+            vpaddl = "llvm.aarch64.neon.uaddlp"
             full_dtype = "uint8x16"
             half_dtype = "uint8x8"
             return_dtype = "uint16x8"
+        if is_aarch64:
+            vpadd = "llvm.aarch64.neon.addp"
+
+        def _vpadal(acc, cnts):
+            # AArch64 has no pairwise add and accumulate intrinsic, LLVM folds the
+            # long pairwise add followed by an add into a single uadalp/sadalp.
+            if is_aarch64:
+                return acc + tvm.tir.call_llvm_pure_intrin(return_dtype, vpaddl, args_1, cnts)
+            return tvm.tir.call_llvm_pure_intrin(return_dtype, vpadalu, args_2, acc, cnts)
 
         def _instr(index):
             irb = tvm.tir.ir_builder.create()
             if index == 1:  # reduce reset
-                irb.emit(zz.vstore(0, tvm.tir.const(0, return_dtype)))
+                for o in range(0, m, 8):
+                    irb.emit(zz.vstore(o, tvm.tir.const(0, return_dtype)))
                 return irb.get()
             # body and reduce update
+            # rows are reduced in blocks of 8, each into its own 8 lane accumulator
             cnts8 = [None] * 8
             cnts4 = [None] * 4
             cnts2 = [None] * 2
             for bw in range(w_b):
                 for bx in range(x_b):
                     if k_i == 16:
-                        for i in range(m):
-                            w_ = ww.vload([bw, i, 0], "uint8x16").astype(full_dtype)
-                            x_ = xx.vload([bx, 0], "uint8x16").astype(full_dtype)
-                            if unipolar:
-                                cnts = tvm.tir.popcount(w_ & x_) - tvm.tir.popcount(~w_ & x_)
-                            else:
-                                cnts = tvm.tir.popcount(w_ & x_)
-                            upper_half = tvm.tir.call_intrin(half_dtype, "tir.vectorhigh", cnts)
-                            lower_half = tvm.tir.call_intrin(half_dtype, "tir.vectorlow", cnts)
-                            cnts8[i] = upper_half + lower_half
-                        for i in range(m // 2):
-                            cnts4[i] = tvm.tir.call_llvm_pure_intrin(
-                                half_dtype, vpadd, args_2, cnts8[i * 2], cnts8[i * 2 + 1]
-                            )
-                        for i in range(m // 4):
-                            cnts2[i] = tvm.tir.call_llvm_pure_intrin(
-                                half_dtype, vpadd, args_2, cnts4[i * 2], cnts4[i * 2 + 1]
-                            )
-                        cnts = tvm.tir.call_intrin(
-                            full_dtype, "tir.vectorcombine", cnts2[0], cnts2[1]
-                        )
-                        shifted_cnts = cnts << tvm.tir.const(bw + bx, pack_dtype)
-                        out = tvm.tir.call_llvm_pure_intrin(
-                            return_dtype, vpadalu, args_2, zz.vload(0, return_dtype), shifted_cnts
-                        )
+                        x_ = xx.vload([bx, 0], "uint8x16").astype(full_dtype)
+                        if unipolar:
+                            x_cnts = tvm.tir.popcount(x_)
                     else:  # ki == 8
-                        for i in range(m):
-                            w_ = ww.vload([bw, i, 0], "uint8x8").astype(half_dtype)
-                            x_ = xx.vload([bx, 0], "uint8x8").astype(half_dtype)
-                            if unipolar:
-                                cnts8[i] = tvm.tir.popcount(w_ & x_) - tvm.tir.popcount(~w_ & x_)
-                            else:
-                                cnts8[i] = tvm.tir.popcount(w_ & x_)
-                        for i in range(m // 2):
+                        x_ = xx.vload([bx, 0], "uint8x8").astype(half_dtype)
+                        if unipolar:
+                            x_cnts = tvm.tir.popcount(x_)
+                    for o in range(0, m, 8):
+                        if k_i == 16:
+                            for i in range(8):
+                                w_ = ww.vload([bw, o + i, 0], "uint8x16").astype(full_dtype)
+                                if unipolar:
+                                    cnts = (
+                                        tvm.tir.popcount(w_ & x_) << tvm.tir.const(1, pack_dtype)
+                                    ) - x_cnts
+                                else:
+                                    cnts = tvm.tir.popcount(w_ & x_)
+                                upper_half = tvm.tir.call_intrin(
+                                    half_dtype, "tir.vectorhigh", cnts
+                                )
+                                lower_half = tvm.tir.call_intrin(half_dtype, "tir.vectorlow", cnts)
+                                cnts8[i] = upper_half + lower_half
+                        else:  # ki == 8
+                            for i in range(8):
+                                w_ = ww.vload([bw, o + i, 0], "uint8x8").astype(half_dtype)
+                                if unipolar:
+                                    cnts8[i] = (
+                                        tvm.tir.popcount(w_ & x_) << tvm.tir.const(1, pack_dtype)
+                                    ) - x_cnts
+                                else:
+                                    cnts8[i] = tvm.tir.popcount(w_ & x_)
+                        for i in range(4):
                             cnts4[i] = tvm.tir.call_llvm_pure_intrin(
                                 half_dtype, vpadd, args_2, cnts8[i * 2], cnts8[i * 2 + 1]
                             )
-                        for i in range(m // 4):
+                        for i in range(2):
                             cnts2[i] = tvm.tir.call_llvm_pure_intrin(
                                 half_dtype, vpadd, args_2, cnts4[i * 2], cnts4[i * 2 + 1]
                             )
@@ -331,10 +357,8 @@ def _intrin_popcount(m, k_i, w_b, x_b, unipolar):
                             full_dtype, "tir.vectorcombine", cnts2[0], cnts2[1]
                         )
                         shifted_cnts = cnts << tvm.tir.const(bw + bx, pack_dtype)
-                        out = tvm.tir.call_llvm_pure_intrin(
-                            return_dtype, vpadalu, args_2, zz.vload(0, return_dtype), shifted_cnts
-                        )
-                    irb.emit(zz.vstore(0, out))
+                        out = _vpadal(zz.vload(o, return_dtype), shifted_cnts)
+                        irb.emit(zz.vstore(o, out))
             return irb.get()
 
         # body, reset, update
@@ -363,12 +387,21 @@ def _schedule_spatial_conv2d_nhwc(
     if data_pad is not None:
         s[data_pad].compute_inline()
 
-    _, h, _, _, _, _, _ = s[data_vec].op.axis
+    _, h, _, _, _, _, ci = s[data_vec].op.axis
     cfg.define_split("tile_ah", cfg.axis(h), num_outputs=2, max_factor=32)
     oh, ih = cfg["tile_ah"].apply(s, data_vec, h)
     s[data_vec].parallel(oh)
+    # Packed channels are contiguous in data_pad, copy them one NEON register at a time
+    for factor in [16, 8]:
+        if get_const_int(CI) % factor == 0:
+            _, ci_i = s[data_vec].split(ci, factor=factor)
+            s[data_vec].vectorize(ci_i)
+            break
 
     #### Schedule kernel packing
+    # Input channel padding of the kernel is done in the same pass as the packing
+    if "pad" in kernel_vec.op.tag:
+        s[kernel_vec.op.input_tensors[0]].compute_inline()
     co, _, _, _, _, _ = s[kernel_vec].op.axis
     cfg.define_split("tile_bco", cfg.axis(co), num_outputs=2, max_factor=32)
     oco, ico = cfg["tile_bco"].apply(s, kernel_vec, co)
@@ -390,16 +423,22 @@ def _schedule_spatial_conv2d_nhwc(
         s[conv_out].tensorize(kb, pc)
 
     n, h, w, co = s[last].op.axis
-    co, vc = cfg["tile_co"].apply(s, last, co)
+    co_o, co_i, vc = cfg["tile_co"].apply(s, last, co)
     oh, vh = cfg["tile_oh"].apply(s, last, h)
     ow, vw = cfg["tile_ow"].apply(s, last, w)
-    s[last].reorder(n, oh, ow, co, vh, vw, vc)
+    # Order output channel blocks outside the spatial tiles, so the parallel tasks
+    # of one block only touch the kernel_vec channels of that block
+    s[last].reorder(n, co_o, oh, ow, co_i, vh, vw, vc)
     s[last].vectorize(vc)
     if last != output:
         s[output].compute_inline()
 
-    s[conv_out].compute_at(s[last], co)
-    s[last].parallel(oh)
+    # Compute each VC wide accumulator right where it is written to the output,
+    # so the conv_vec -> conv reindexing never goes through a VH x VW tile
+    s[conv_out].compute_at(s[last], vw)
+    # Small late layers do not have enough oh tiles alone to occupy every core
+    fused = s[last].fuse(co_o, oh, ow, co_i)
+    s[last].parallel(fused)
     return s
 
 
@@ -452,13 +491,19 @@ def _bitserial_conv2d_legalize(attrs, inputs, arg_types):
     # Fix different kernel layouts where possible.
     if attrs["data_layout"] == "NHWC":
         data, kernel = inputs
-        if len(kernel.data.shape) == 4:
+        if len(arg_types[1].shape) == 4:
             # HWIO layout is expected for NHWC input.
             if attrs["kernel_layout"] == "HWOI":
                 # Handle HWOI layout. This is common in TF depthwise conv2d graph.
                 kernel = relay.transpose(kernel, axes=(0, 1, 3, 2))
             elif attrs["kernel_layout"] == "OIHW":
                 kernel = relay.transpose(kernel, axes=(2, 3, 1, 0))
+            if isinstance(inputs[1], relay.Constant):
+                # Bit pack the constant weights in the graph, where FoldConstant evaluates
+                # it once at compile time instead of on every call of the operator.
+                kernel = relay.nn.bitpack(
+                    kernel, bits=attrs["weight_bits"], pack_axis=2, bit_axis=2, pack_type="uint8"
+                )
             ## Set new attrs for the tranposed conv.
             new_attrs = {k: attrs[k] for k in attrs.keys()}
             new_attrs["kernel_layout"] = "HWIO"
@@ -103,15 +103,14 @@ def bitserial_dense(cfg, data, weight, data_bits, weight_bits, pack_dtype, out_d
         oshape,
         lambda x, y: te.sum(
             (
-                tvm.tir.popcount(
-                    weight_vec[y // VY, k // VK, wb, y % VY, k % VK].astype(out_dtype)
-                    & data_packed[x, db, k].astype(out_dtype)
+                (
+                    tvm.tir.popcount(
+                        weight_vec[y // VY, k // VK, wb, y % VY, k % VK] & data_packed[x, db, k]
+                    ).astype("int8")
+                    << tvm.tir.const(1, "int8")
                 )
-                - tvm.tir.popcount(
-                    ~weight_vec[y // VY, k // VK, wb, y % VY, k % VK].astype(out_dtype)
-                    & data_packed[x, db, k].astype(out_dtype)
-                )
-            )
+                - tvm.tir.popcount(data_packed[x, db, k]).astype("int8")
+            ).astype(out_dtype)
             << (wb + db).astype(out_dtype),
             axis=[wb, db, k],
         ),
@@ -122,9 +121,8 @@ def bitserial_dense(cfg, data, weight, data_bits, weight_bits, pack_dtype, out_d
         oshape,
         lambda x, y: te.sum(
             tvm.tir.popcount(
-                weight_vec[y // VY, k // VK, wb, y % VY, k % VK].astype(out_dtype)
-                & data_packed[x, db, k].astype(out_dtype)
-            )
+                weight_vec[y // VY, k // VK, wb, y % VY, k % VK] & data_packed[x, db, k]
+            ).astype(out_dtype)
             << (wb + db).astype(out_dtype),
             axis=[wb, db, k],
         ),
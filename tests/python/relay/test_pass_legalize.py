@@ -234,5 +234,60 @@ def test_conv2d_NHWC_legalize(target, exp_in_channels):
     assert act_in_channels == exp_in_channels, "Actual input channels = " + str(act_in_channels)
 
 
+def test_bitserial_conv2d_NHWC_legalize():
+    """arm_cpu bitserial_conv2d kernels are moved to HWIO, constant ones are also bit packed"""
+    target = tvm.target.Target("llvm -device=arm_cpu -mtriple=aarch64-linux-gnu")
+
+    x = relay.var("x", shape=(1, 56, 56, 64), dtype="uint32")
+    weight = relay.const(np.ones((3, 3, 64, 32), dtype="uint32"))
+    out = relay.nn.bitserial_conv2d(
+        x,
+        weight,
+        padding=(1, 1),
+        channels=32,
+        kernel_size=(3, 3),
+        activation_bits=2,
+        weight_bits=2,
+        data_layout="NHWC",
+        kernel_layout="HWIO",
+        pack_dtype="uint8",
+        unipolar=False,
+    )
+
+    with target:
+        out = run_opt_pass(out, [transform.Legalize(), transform.FoldConstant()])
+
+    packed_weight = out.args[1]
+    assert isinstance(packed_weight, relay.Constant)
+    assert packed_weight.data.shape == (3, 3, 2, 8, 32)
+    assert packed_weight.data.dtype == "uint8"
+
+    # Weights only known at runtime are still transposed to HWIO, but left unpacked
+    weight = relay.var("weight", shape=(32, 64, 3, 3), dtype="uint32")
+    out = relay.nn.bitserial_conv2d(
+        x,
+        weight,
+        padding=(1, 1),
+        channels=32,
+        kernel_size=(3, 3),
+        activation_bits=2,
+        weight_bits=2,
+        data_layout="NHWC",
+        kernel_layout="OIHW",
+        pack_dtype="uint8",
+        unipolar=False,
+    )
+
+    with target:
+        out = run_opt_pass(out, transform.Legalize())
+
+    assert out.attrs.kernel_layout == "HWIO"
+    transposed_weight = out.args[1]
+    assert isinstance(transposed_weight, relay.Call)
+    assert transposed_weight.op.name == "transpose"
+    assert list(transposed_weight.attrs.axes) == [2, 3, 1, 0]
+    assert isinstance(transposed_weight.args[0], relay.Var)
+
+
 if __name__ == "__main__":
     tvm.testing.main()
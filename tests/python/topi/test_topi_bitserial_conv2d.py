@@ -27,7 +27,7 @@ from tvm.contrib.pickle_memoize import memoize
 def generate_quantized_np(shape, bits, out_dtype):
     min_val = 0
     max_val = 1 << bits
-    return np.random.randint(min_val, max_val, size=shape).astype(out_dtype)
+    return np.random.default_rng().integers(min_val, max_val, size=shape, dtype=out_dtype)
 
 
 def verify_bitserial_conv2d_nchw(
@@ -62,9 +62,7 @@ def verify_bitserial_conv2d_nchw(
         a_np = generate_quantized_np(get_const_tuple(a_shape), activation_bits, input_dtype)
         w_np = generate_quantized_np(get_const_tuple(w_shape), weight_bits, input_dtype)
         if unipolar:
-            w_ = np.copy(w_np).astype(out_dtype)
-            for x in np.nditer(w_, op_flags=["readwrite"]):
-                x[...] = 1 if x == 1 else -1
+            w_ = np.where(w_np == 1, 1, -1).astype(out_dtype)
             b_np = tvm.topi.testing.conv2d_nchw_python(a_np.astype(out_dtype), w_, stride, padding)
         else:
             b_np = tvm.topi.testing.conv2d_nchw_python(a_np, w_np, stride, padding)
@@ -113,9 +111,7 @@ def verify_bitserial_conv2d_nhwc(
         a_np = generate_quantized_np(get_const_tuple(a_shape), activation_bits, input_dtype)
         w_np = generate_quantized_np(get_const_tuple(w_shape), weight_bits, input_dtype)
         if unipolar:
-            w_ = np.copy(w_np).astype(out_dtype)
-            for x in np.nditer(w_, op_flags=["readwrite"]):
-                x[...] = 1 if x == 1 else -1
+            w_ = np.where(w_np == 1, 1, -1).astype(out_dtype)
             b_np = tvm.topi.testing.conv2d_nhwc_python(a_np, w_, stride, padding).astype(out_dtype)
         else:
             b_np = tvm.topi.testing.conv2d_nhwc_python(a_np, w_np, stride, padding).astype(
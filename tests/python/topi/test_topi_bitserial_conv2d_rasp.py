@@ -20,15 +20,39 @@ import numpy as np
 import tvm
 from tvm import te
 from tvm import topi
+from tvm import autotvm
+import tvm.testing
 import tvm.topi.testing
-from tvm.topi.utils import get_const_tuple
+from tvm.topi.utils import get_const_int, get_const_tuple
+
+
+ARMV7 = "llvm -device=arm_cpu -model=bcm2837 -mtriple=armv7l-linux-gnueabihf -mattr=+neon"
+AARCH64 = "llvm -device=arm_cpu -model=bcm2711 -mtriple=aarch64-linux-gnu -mattr=+neon"
+AARCH64_SVE = "llvm -device=arm_cpu -mtriple=aarch64-linux-gnu -mattr=+neon,+sve"
 
 
 def generate_quantized_np(shape, bits, out_dtype):
-    np.random.seed(0)
     min_val = 0
     max_val = 1 << bits
-    return np.random.randint(min_val, max_val, size=shape).astype(out_dtype)
+    rng = np.random.default_rng(0)
+    return rng.integers(min_val, max_val, size=shape, dtype=out_dtype)
+
+
+class TileCoFallback(autotvm.FallbackContext):
+    """Fallback context with a fixed output channel tile (VC)"""
+
+    def __init__(self, vc):
+        super(TileCoFallback, self).__init__()
+        self.vc = vc
+
+    def _query_inside(self, target, workload):
+        key = (str(target), workload)
+        if key in self.memory:
+            return self.memory[key]
+        cfg = autotvm.task.space.FallbackConfigEntity()
+        cfg["tile_co"] = autotvm.task.space.SplitEntity([-1, 1, self.vc])
+        self.memory[key] = cfg
+        return cfg
 
 
 # Verify that certain special instructions from the tensorize pass exist
@@ -44,13 +68,20 @@ def verify_bitserial_conv2d_nhwc(
     weight_bits,
     unipolar,
     use_relu=False,
+    device=ARMV7,
+    run=True,
+    vc=8,
 ):
     in_height = in_width = in_size
     input_type = "uint32"
     out_dtype = "int16"
 
-    device = "llvm -device=arm_cpu -model=bcm2837 -mtriple=armv7l-linux-gnueabihf -mattr=+neon"
-    with tvm.target.Target(device):
+    if tvm.target.Target(device).features.is_aarch64:
+        instructions = ("sadalp" if unipolar else "uadalp", "cnt", "addp")
+    else:
+        instructions = ("vpadal", "vcnt", "vpadd")
+
+    with tvm.target.Target(device), TileCoFallback(vc):
         A = te.placeholder((batch, in_height, in_width, in_channel), dtype=input_type, name="A")
         W = te.placeholder((kernel, kernel, in_channel, num_filter), dtype=input_type, name="W")
         B = topi.arm_cpu.bitserial_conv2d_nhwc(
@@ -59,20 +90,22 @@ def verify_bitserial_conv2d_nhwc(
         if use_relu:
             B = topi.nn.relu(B)
         s = topi.arm_cpu.schedule_bitserial_conv2d_nhwc([B])
+    if not use_relu:
+        conv_vec = B.op.input_tensors[0]
+        assert get_const_tuple(conv_vec.shape)[-1] == vc
 
     func = tvm.build(s, [A, W, B], device)
 
     assembly = func.get_source("asm")
-    matches = re.findall("vpadal", assembly)
-    assert len(matches) > 0
-    matches = re.findall("vcnt", assembly)
-    assert len(matches) > 0
-    matches = re.findall("vpadd", assembly)
-    assert len(matches) > 0
+    for instruction in instructions:
+        matches = re.findall(instruction, assembly)
+        assert len(matches) > 0
 
     dev = tvm.device(device, 0)
-    if "arm" not in os.uname()[4]:
-        print("Skipped running code, not an arm device")
+    if not run:
+        return
+    if os.uname()[4] not in device:
+        print("Skipped running code, not a %s device" % device)
         return
 
     print("Running on target: %s" % device)
@@ -81,9 +114,7 @@ def verify_bitserial_conv2d_nhwc(
         a_np = generate_quantized_np(get_const_tuple(A.shape), activation_bits, input_type)
         w_np = generate_quantized_np(get_const_tuple(W.shape), weight_bits, input_type)
         if unipolar:
-            w_ = np.copy(w_np).astype(out_dtype)
-            for x in np.nditer(w_, op_flags=["readwrite"]):
-                x[...] = 1 if x == 1 else -1
+            w_ = np.where(w_np == 1, 1, -1).astype(out_dtype)
             b_np = tvm.topi.testing.conv2d_nhwc_python(a_np, w_, stride, padding).astype(out_dtype)
         else:
             b_np = tvm.topi.testing.conv2d_nhwc_python(a_np, w_np, stride, padding).astype(
@@ -101,21 +132,50 @@ def verify_bitserial_conv2d_nhwc(
     np.testing.assert_allclose(b.numpy(), b_np, rtol=1e-5)
 
 
-def test_bitserial_conv2d():
-    in_size = 56
-    ic, oc = 64, 64
-    k = 3
-    stride = 1
-    pad = 1
+device = tvm.testing.parameter(ARMV7, AARCH64, AARCH64_SVE)
+unipolar = tvm.testing.parameter(False, True)
+activation_bits = tvm.testing.parameter(1, 2)
+# Two 8 row blocks per microkernel call for VC=16, each with its own accumulator
+vc = tvm.testing.parameter(8, 16)
+use_relu = tvm.testing.parameter(False, True)
+
+
+def test_bitserial_conv2d(device, unipolar, activation_bits, vc, use_relu):
+    # SVE cores implement AdvSIMD, the NEON microkernel is used for them as well.
+    # Running it is left to test_bitserial_conv2d_aarch64_sve.
+    run = not tvm.target.Target(device).features.has_sve
+    verify_bitserial_conv2d_nhwc(
+        1, 56, 64, 64, 3, 1, 1, activation_bits, 1, unipolar, use_relu, device, run=run, vc=vc
+    )
+
+
+@tvm.testing.requires_aarch64_sve
+def test_bitserial_conv2d_aarch64_sve(unipolar, activation_bits):
+    verify_bitserial_conv2d_nhwc(
+        1, 56, 64, 64, 3, 1, 1, activation_bits, 1, unipolar, device=AARCH64_SVE
+    )
+
+
+def test_bitserial_conv2d_parallel_small_oh():
+    # A single oh and ow tile, the parallel loop has to come from the channel blocks
+    in_size, ic, oc = 7, 64, 64
+    with tvm.target.Target(ARMV7):
+        A = te.placeholder((1, in_size, in_size, ic), dtype="uint32", name="A")
+        W = te.placeholder((3, 3, ic, oc), dtype="uint32", name="W")
+        B = topi.arm_cpu.bitserial_conv2d_nhwc(A, W, 1, 1, 2, 1, "uint8", "int16", False)
+        s = topi.arm_cpu.schedule_bitserial_conv2d_nhwc([B])
+    out_vc = get_const_tuple(B.op.input_tensors[0].shape)[-1]
 
-    verify_bitserial_conv2d_nhwc(1, in_size, ic, oc, k, stride, pad, 1, 1, False)
-    verify_bitserial_conv2d_nhwc(1, in_size, ic, oc, k, stride, pad, 2, 1, False)
+    extents = []
 
-    verify_bitserial_conv2d_nhwc(1, in_size, ic, oc, k, stride, pad, 1, 1, True)
-    verify_bitserial_conv2d_nhwc(1, in_size, ic, oc, k, stride, pad, 2, 1, True)
+    def _visit(stmt):
+        if isinstance(stmt, tvm.tir.For) and stmt.kind == tvm.tir.ForKind.PARALLEL:
+            extents.append(stmt.extent)
 
-    verify_bitserial_conv2d_nhwc(1, in_size, ic, oc, k, stride, pad, 2, 1, True, True)
+    tvm.tir.stmt_functor.post_order_visit(tvm.lower(s, [A, W, B])["main"].body, _visit)
+    # The output stage is lowered last
+    assert get_const_int(extents[-1]) == oc // out_vc
 
 
 if __name__ == "__main__":
-    test_bitserial_conv2d()
+    tvm.testing.main()
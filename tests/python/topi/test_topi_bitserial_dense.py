@@ -35,23 +35,36 @@ _bitserial_dense_implement = {
 def generate_quantized_np(shape, bits, out_dtype):
     min_val = 0
     max_val = 1 << bits
-    return np.random.randint(min_val, max_val, size=shape).astype(out_dtype)
+    return np.random.default_rng().integers(min_val, max_val, size=shape, dtype=out_dtype)
 
 
-def verify_bitserial_dense(batch, in_dim, out_dim, activation_bits, weight_bits, unipolar):
+batch, in_dim, out_dim = tvm.testing.parameters((1, 1024, 1000))
+activation_bits, weight_bits = tvm.testing.parameters((1, 1), (2, 1))
+unipolar = tvm.testing.parameter(True, False)
+
+
+@tvm.testing.fixture(cache_return_value=True)
+def quantized_inputs(batch, in_dim, out_dim, activation_bits, weight_bits):
+    # Shared by the unipolar and bipolar cases of the same bit widths
+    a_np = generate_quantized_np((batch, in_dim), activation_bits, "uint32")
+    b_np = generate_quantized_np((out_dim, in_dim), weight_bits, "uint32")
+    return a_np, b_np
+
+
+def test_bitserial_dense(
+    batch, in_dim, out_dim, activation_bits, weight_bits, unipolar, quantized_inputs
+):
     out_dtype = "int16"
+    a_np, b_np = quantized_inputs
 
-    def get_ref_data(a_shape, b_shape, input_dtype):
-        a_np = generate_quantized_np(get_const_tuple(a_shape), activation_bits, input_dtype)
-        b_np = generate_quantized_np(get_const_tuple(b_shape), weight_bits, input_dtype)
-        if unipolar:
-            b_ = np.copy(b_np).astype(out_dtype)
-            for x in np.nditer(b_, op_flags=["readwrite"]):
-                x[...] = 1 if x == 1 else -1
-            c_np = np.dot(a_np, b_.T)
-        else:
-            c_np = np.dot(a_np, b_np.T)
-        return a_np, b_np, c_np
+    # Accumulate the reference in int32, numpy has no fast integer GEMM for
+    # narrower types and uint8 operands would overflow
+    a_ = a_np.astype(np.int32)
+    if unipolar:
+        b_ = np.where(b_np == 1, 1, -1).astype(np.int32)
+    else:
+        b_ = b_np.astype(np.int32)
+    c_np = np.dot(a_, b_.T).astype(out_dtype)
 
     for target in ["llvm", "llvm -device=arm_cpu"]:
         target = tvm.target.Target(target)
@@ -65,26 +78,14 @@ def verify_bitserial_dense(batch, in_dim, out_dim, activation_bits, weight_bits,
         C = fcompute(A, B, activation_bits, weight_bits, input_dtype, out_dtype, unipolar)
         s = fschedule([C])
 
-        a_shape = get_const_tuple(A.shape)
-        b_shape = get_const_tuple(B.shape)
-        a_np, b_np, c_np = get_ref_data(a_shape, b_shape, input_dtype)
-
         dev = tvm.cpu(0)
-        a = tvm.nd.array(a_np, dev)
-        b = tvm.nd.array(b_np, dev)
+        a = tvm.nd.array(a_np.astype(input_dtype), dev)
+        b = tvm.nd.array(b_np.astype(input_dtype), dev)
         c = tvm.nd.array(np.zeros(get_const_tuple(C.shape), dtype=C.dtype), dev)
         func = tvm.build(s, [A, B, C], target)
         func(a, b, c)
         tvm.testing.assert_allclose(c.numpy(), c_np, rtol=1e-5)
 
 
-def test_bitserial_dense():
-    verify_bitserial_dense(1, 1024, 1000, 1, 1, True)
-    verify_bitserial_dense(1, 1024, 1000, 2, 1, True)
-
-    verify_bitserial_dense(1, 1024, 1000, 1, 1, False)
-    verify_bitserial_dense(1, 1024, 1000, 2, 1, False)
-
-
 if __name__ == "__main__":
-    test_bitserial_dense()
+    tvm.testing.main()